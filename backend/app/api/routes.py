@@ -3,6 +3,7 @@ API Routes
 Handles all incoming web requests for predictions, health checks, and metadata.
 """
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from datetime import datetime
 import json
 from pathlib import Path
@@ -14,11 +15,23 @@ from app.schemas.prediction import (
     ErrorResponse
 )
 from app.services.prediction_service import prediction_service
+from app.core.config import settings
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+def render_fast_response(result: dict) -> ORJSONResponse:
+    """
+    Renders a prediction straight to JSON bytes.
+    Input features were validated on the way in, so they are dumped as-is
+    instead of going back through the response model.
+    """
+    features = result.pop("input_features")
+    if settings.echo_input_features:
+        result["input_features"] = features.model_dump()
+    return ORJSONResponse(content=result)
+
 @router.post(
     "/predict",
     response_model=PredictionResponse,
@@ -32,6 +45,8 @@ async def predict_price(features: HouseFeaturesInput):
     try:
         logger.info(f"Prediction requested for: {features.location}")
         result = prediction_service.predict(features)
+        if settings.fast_response:
+            return render_fast_response(result)
         return result
     except ValueError as e:
         logger.error(f"Input error: {e}")
@@ -73,6 +88,16 @@ async def get_model_info():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/shadow-stats", summary="Compare candidate model against live model")
+async def get_shadow_stats():
+    """
+    Returns running difference and latency statistics from shadow scoring.
+    """
+    try:
+        return prediction_service.get_shadow_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/options", response_model=dict, summary="Get dynamic form options")
 async def get_form_options():
     """
@@ -2,9 +2,10 @@
 Application Configuration
 Loads settings for the API, CORS, and ML model paths.
 """
+from pydantic import Field
 from pydantic_settings import BaseSettings
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     # App Identity
@@ -23,6 +24,18 @@ class Settings(BaseSettings):
     feature_names_path: Path = base_dir / "ml" / "models" / "feature_names.joblib"
     metadata_path: Path = base_dir / "ml" / "models" / "model_metadata.joblib"
     
+    # Shadow scoring of a candidate model on sampled live traffic
+    shadow_model_path: Optional[Path] = None
+    shadow_scaler_path: Optional[Path] = None   # defaults to scaler_path
+    shadow_encoder_path: Optional[Path] = None  # defaults to encoder_path
+    shadow_sample_rate: float = Field(0.1, ge=0, le=1)
+    shadow_queue_size: int = Field(1000, gt=0)
+    shadow_batch_size: int = Field(32, gt=0)
+    
+    # Fast response mode: skip response-model re-validation and render with orjson
+    fast_response: bool = False
+    echo_input_features: bool = True
+    
     log_level: str = "INFO"
     
     class Config:
@@ -27,8 +27,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Failed to load model: {str(e)}")
     
+    try:
+        prediction_service.start_shadow()
+    except Exception as e:
+        logger.error(f"Failed to start shadow scoring: {str(e)}")
+    
     yield
     # Shutdown tasks
+    prediction_service.stop_shadow()
     logger.info("Service shutting down")
 
 app = FastAPI(
@@ -5,6 +5,10 @@ Contains the logic for loading the ML model and running inference.
 import pandas as pd
 import numpy as np
 import joblib
+import queue
+import random
+import threading
+import time
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
@@ -15,6 +19,66 @@ from app.schemas.prediction import HouseFeaturesInput
 
 logger = get_logger(__name__)
 
+class ShadowStats:
+    """Running comparison between the live model and a shadow candidate."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sampled = 0
+        self.dropped = 0
+        self.scored = 0
+        self.failed = 0
+        self.batches = 0
+        self.abs_diff_sum = 0.0
+        self.abs_diff_max = 0.0
+        self.rel_diff_sum = 0.0
+        self.rel_diff_max = 0.0
+        self.live_latency_sum = 0.0
+        self.primary_batch_latency_sum = 0.0
+        self.candidate_batch_latency_sum = 0.0
+    
+    def record_batch(self, primary: np.ndarray, candidate: np.ndarray, live_latency: np.ndarray,
+                     primary_batch_latency: float, candidate_batch_latency: float):
+        abs_diff = np.abs(candidate - primary)
+        rel_diff = abs_diff / np.maximum(np.abs(primary), 1e-9)
+        with self.lock:
+            self.scored += len(primary)
+            self.batches += 1
+            self.abs_diff_sum += float(abs_diff.sum())
+            self.abs_diff_max = max(self.abs_diff_max, float(abs_diff.max()))
+            self.rel_diff_sum += float(rel_diff.sum())
+            self.rel_diff_max = max(self.rel_diff_max, float(rel_diff.max()))
+            self.live_latency_sum += float(live_latency.sum())
+            self.primary_batch_latency_sum += primary_batch_latency
+            self.candidate_batch_latency_sum += candidate_batch_latency
+    
+    def summary(self) -> Dict:
+        with self.lock:
+            n = self.scored
+            b = self.batches
+            return {
+                "sampled": self.sampled,
+                "dropped": self.dropped,
+                "scored": n,
+                "failed": self.failed,
+                "batches": self.batches,
+                "abs_diff": {
+                    "mean": self.abs_diff_sum / n if n else None,
+                    "max": self.abs_diff_max if n else None
+                },
+                "rel_diff": {
+                    "mean": self.rel_diff_sum / n if n else None,
+                    "max": self.rel_diff_max if n else None
+                },
+                # Milliseconds. "live" is the single-row call on the request path;
+                # both batch figures time the same batches, so they compare like for like
+                "latency_ms": {
+                    "live_per_request": self.live_latency_sum / n * 1000 if n else None,
+                    "primary_per_batch": self.primary_batch_latency_sum / b * 1000 if b else None,
+                    "candidate_per_batch": self.candidate_batch_latency_sum / b * 1000 if b else None
+                },
+                "mean_batch_size": n / b if b else None
+            }
+
 class PredictionService:
     def __init__(self):
         self.model = None
@@ -24,6 +88,14 @@ class PredictionService:
         self.metadata = None
         self.model_loaded = False
         
+        # Shadow scoring state
+        self.shadow_model = None
+        self.shadow_scaler = None
+        self.shadow_encoders = None
+        self.shadow_queue = None
+        self.shadow_thread = None
+        self.shadow_stats = ShadowStats()
+        
     def load_model(self):
         """Loads all ML artifacts into memory."""
         try:
@@ -45,6 +117,90 @@ class PredictionService:
             self.model_loaded = False
             raise
     
+    def start_shadow(self):
+        """Loads the candidate artifacts and starts the background scoring worker."""
+        if settings.shadow_model_path is None:
+            return
+        if not settings.shadow_model_path.exists():
+            raise FileNotFoundError(f"Shadow model file missing at {settings.shadow_model_path}")
+        
+        # A retrained candidate comes with its own fitted scaler and encoders
+        self.shadow_model = joblib.load(settings.shadow_model_path)
+        self.shadow_scaler = joblib.load(settings.shadow_scaler_path or settings.scaler_path)
+        self.shadow_encoders = joblib.load(settings.shadow_encoder_path or settings.encoder_path)
+        self.shadow_stats = ShadowStats()
+        self.shadow_queue = queue.Queue(maxsize=settings.shadow_queue_size)
+        self.shadow_thread = threading.Thread(target=self._shadow_worker, name="shadow-scorer", daemon=True)
+        self.shadow_thread.start()
+        logger.info(f"Shadow scoring enabled at {settings.shadow_sample_rate:.0%} of traffic.")
+    
+    def stop_shadow(self):
+        """Signals the worker to finish and waits for it to exit."""
+        if self.shadow_thread is None:
+            return
+        # Block for the sentinel: it must not be dropped like a sample
+        self.shadow_queue.put(None)
+        self.shadow_thread.join(timeout=5)
+        self.shadow_thread = None
+        self.shadow_model = None
+        self.shadow_scaler = None
+        self.shadow_encoders = None
+    
+    def _submit_shadow(self, features: HouseFeaturesInput, prediction: float, latency: float):
+        """Offers a sample to the shadow queue without ever blocking."""
+        if self.shadow_thread is None or random.random() >= settings.shadow_sample_rate:
+            return
+        try:
+            self.shadow_queue.put_nowait((features, prediction, latency))
+            with self.shadow_stats.lock:
+                self.shadow_stats.sampled += 1
+        except queue.Full:
+            with self.shadow_stats.lock:
+                self.shadow_stats.dropped += 1
+    
+    def _shadow_worker(self):
+        """Scores queued samples in batches with both the live and candidate models."""
+        stopping = False
+        while not stopping:
+            batch = [self.shadow_queue.get()]
+            while len(batch) < settings.shadow_batch_size:
+                try:
+                    batch.append(self.shadow_queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                stopping = True
+                batch = [item for item in batch if item is not None]
+            if not batch:
+                continue
+            
+            inputs, primary, live_latency = zip(*batch)
+            try:
+                df = pd.DataFrame([features.model_dump() for features in inputs])
+                X_primary = self.transform_frame(df.copy(), self.scaler, self.encoders)
+                X_candidate = self.transform_frame(df, self.shadow_scaler, self.shadow_encoders)
+                
+                # Re-time the live model on the same batch so batching favours neither side
+                start = time.perf_counter()
+                self.model.predict(X_primary)
+                primary_batch_latency = time.perf_counter() - start
+                
+                start = time.perf_counter()
+                candidate = self.shadow_model.predict(X_candidate)
+                candidate_batch_latency = time.perf_counter() - start
+                
+                self.shadow_stats.record_batch(
+                    np.asarray(primary, dtype=float),
+                    np.asarray(candidate, dtype=float),
+                    np.asarray(live_latency, dtype=float),
+                    primary_batch_latency,
+                    candidate_batch_latency
+                )
+            except Exception as e:
+                logger.error(f"Shadow scoring failed: {e}")
+                with self.shadow_stats.lock:
+                    self.shadow_stats.failed += len(batch)
+    
     def preprocess_input(self, features: HouseFeaturesInput) -> np.ndarray:
         """Transforms raw input data into ML-ready numerical format."""
         try:
@@ -60,26 +216,28 @@ class PredictionService:
                 'modular_kitchen': [features.modular_kitchen],
                 'dining_hall': [features.dining_hall]
             }
-            df = pd.DataFrame(data)
-            
-            # Label encoding for categorical fields
-            for col, encoder in self.encoders.items():
-                if col in df.columns:
-                    try:
-                        df[col] = encoder.transform(df[col])
-                    except ValueError:
-                        # Fallback for unseen labels
-                        safe_class = encoder.classes_[0]
-                        df[col] = df[col].apply(lambda x: x if x in encoder.classes_ else safe_class)
-                        df[col] = encoder.transform(df[col])
-            
-            # Align features and scale
-            df = df[self.feature_names]
-            return self.scaler.transform(df)
+            return self.transform_frame(pd.DataFrame(data), self.scaler, self.encoders)
         except Exception as e:
             logger.error(f"Preprocessing failed: {e}")
             raise
     
+    def transform_frame(self, df: pd.DataFrame, scaler, encoders: Dict) -> np.ndarray:
+        """Encodes and scales a frame of raw inputs with the given artifacts."""
+        # Label encoding for categorical fields
+        for col, encoder in encoders.items():
+            if col in df.columns:
+                try:
+                    df[col] = encoder.transform(df[col])
+                except ValueError:
+                    # Fallback for unseen labels
+                    safe_class = encoder.classes_[0]
+                    df[col] = df[col].apply(lambda x: x if x in encoder.classes_ else safe_class)
+                    df[col] = encoder.transform(df[col])
+        
+        # Align features and scale
+        df = df[self.feature_names]
+        return scaler.transform(df)
+    
     def predict(self, features: HouseFeaturesInput) -> Dict:
         """Generates a price prediction with confidence intervals."""
         if not self.model_loaded:
@@ -87,7 +245,9 @@ class PredictionService:
         
         try:
             X = self.preprocess_input(features)
+            start = time.perf_counter()
             prediction = self.model.predict(X)[0]
+            self._submit_shadow(features, float(prediction), time.perf_counter() - start)
             
             # Calculate a simplified 5% confidence margin
             margin = prediction * 0.05
@@ -115,6 +275,16 @@ class PredictionService:
             "accuracy": self.metadata.get('accuracy') if self.metadata else "N/A",
             "features": self.feature_names
         }
+    
+    def get_shadow_stats(self) -> Dict:
+        """Returns running comparison statistics for the shadow candidate."""
+        return {
+            "enabled": self.shadow_thread is not None,
+            "candidate_path": str(settings.shadow_model_path) if settings.shadow_model_path else None,
+            "sample_rate": settings.shadow_sample_rate,
+            "queue_depth": self.shadow_queue.qsize() if self.shadow_queue else 0,
+            **self.shadow_stats.summary()
+        }
 
 # Singleton instance for the app
 prediction_service = PredictionService()